@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Annotated
+
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -10,6 +13,7 @@ class Settings(BaseSettings):
 
     # --- LLM provider --------------------------------------------------
     llm_provider: str = "openai"  # "openai" | "azure" | "local"
+    llm_timeout: float = 600.0  # seconds to wait for a completion (SDK default); connect timeout is 5s
 
     # OpenAI
     openai_api_key: str = ""
@@ -28,14 +32,50 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
     log_level: str = "info"
+    reload: bool = False  # dev runner only: auto-reload on code changes (models reload too)
 
     # --- Integration with Node.js server --------------------------------
     internal_token: str = ""  # shared secret between Node server and this engine
-    allowed_origins: str = "*"  # comma-separated origins, e.g. "http://localhost:3000,https://app.example.com"
+    # Env value is comma-separated, e.g. "http://localhost:3000,https://app.example.com"
+    allowed_origins: Annotated[list[str], NoDecode] = ["*"]
 
     # --- Pipeline -------------------------------------------------------
+    # json_schema response_format for stages that define one; unset → on for
+    # openai / azure, off for "local" (many local servers reject json_schema)
+    llm_structured_output: bool | None = None
     max_claims: int = 10
     verification_temperature: float = 0.2
+    # Claim sets up to this size share one verification call (one prompt, no
+    # fan-out overhead); larger sets go one claim per call so the verdicts'
+    # output tokens are generated in parallel rather than in one long reply
+    verification_batch_size: int = 2
+    verification_concurrency: int = 5  # max parallel per-claim verification calls per process, across all requests
+    llm_cache_size: int = 1024  # cached LLM replies (0 disables)
+    llm_cache_ttl: float = 3600.0  # seconds before a cached reply expires
+    verify_cache_size: int = 256  # cached /verify responses, same TTL (0 disables)
+
+    # --- Fake-news classifier (HuggingFace) ------------------------------
+    hf_int8: bool = True  # dynamic INT8 quantization of the classifier's Linear layers
+    hf_bf16: bool = True  # when hf_int8 is off: BF16 weights on CPUs with native BF16 (AVX512-BF16 / AMX)
+    hf_torchscript: bool = True  # trace + freeze the classifier into a TorchScript graph
+    hf_max_batch: int = 16  # max /predict texts coalesced into one batch (one forward per text under hf_int8)
+    hf_batch_timeout_ms: float = 5.0  # how long the batcher waits for peers
+    hf_num_threads: int = 0  # classifier intra-op threads per process; 0 → all cores (use cores // workers under gunicorn)
+    hf_preload: bool = False  # load at import so `gunicorn --preload` workers share the weights
+    hf_cache_size: int = 4096  # cached /predict results, keyed by text digest (0 disables)
+
+    # --- Deepfake detector ----------------------------------------------
+    deepfake_compile: bool = True  # torch.compile the model on CUDA (CUDA-graph replay)
+    deepfake_int8: bool = True  # on CPU, use image_model/deepfake_model_int8.pt when present
+    deepfake_max_batch: int = 8  # max images coalesced into one forward pass
+    deepfake_batch_timeout_ms: float = 8.0  # how long the batcher waits for peers
+
+    @field_validator("allowed_origins", mode="before")
+    @classmethod
+    def _split_origins(cls, v: object) -> object:
+        if isinstance(v, str):
+            return [o.strip() for o in v.split(",") if o.strip()]
+        return v
 
 
 settings = Settings()
@@ -10,28 +10,25 @@ from services.llm_service import chat_completion_json
 
 logger = logging.getLogger("clarix.engine.claim_extractor")
 
+# ``max_claims`` is fixed for the process lifetime — format the prompt once
+_PROMPT = CLAIM_EXTRACTION_PROMPT.replace("{max_claims}", str(settings.max_claims))
+
 
 async def extract_claims(content: str) -> list[str]:
     """Extract up to ``max_claims`` verifiable factual claims from *content*."""
-    prompt = CLAIM_EXTRACTION_PROMPT.replace("{max_claims}", str(settings.max_claims))
-    data = await chat_completion_json(prompt, content)
+    data = await chat_completion_json(_PROMPT, content)
     claims: list[str] = data.get("claims", [])
 
     if not isinstance(claims, list):
         logger.warning("LLM returned non-list claims; coercing to empty.")
         return []
 
-    # Deduplicate, trim whitespace, drop empty strings
-    cleaned: list[str] = []
-    seen: set[str] = set()
+    # Deduplicate (case-insensitively, first spelling wins), trim whitespace,
+    # drop empty strings — one ordered dict does all three
+    unique: dict[str, str] = {}
     for c in claims:
         s = str(c).strip()
-        if not s:
-            continue
-        key = s.lower()
-        if key in seen:
-            continue
-        seen.add(key)
-        cleaned.append(s)
-
-    return cleaned[: settings.max_claims]
+        if s:
+            unique.setdefault(s.casefold(), s)
+
+    return list(unique.values())[: settings.max_claims]
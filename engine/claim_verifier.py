@@ -2,15 +2,47 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import weakref
 from typing import Any
 
+from config import settings
 from prompts.system_prompt import CLAIM_VERIFICATION_PROMPT
 from schemas.response import ClaimAnalysis, ClaimVerdict
 from services.llm_service import chat_completion_json
 
 logger = logging.getLogger("clarix.engine.claim_verifier")
 
+# Structured-output schema for CLAIM_VERIFICATION_PROMPT replies.  Strict
+# mode guarantees parseable JSON with every field present.
+_VERIFICATION_SCHEMA: dict[str, Any] = {
+    "name": "claim_verification",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "claim": {"type": "string"},
+                        "verdict": {"type": "string", "enum": [v.value for v in ClaimVerdict]},
+                        "confidence": {"type": "number"},
+                        "reason": {"type": "string"},
+                        "credible_sources": {"type": "array", "items": {"type": "string"}},
+                    },
+                    "required": ["claim", "verdict", "confidence", "reason", "credible_sources"],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["results"],
+        "additionalProperties": False,
+    },
+}
+
 
 def _parse_verdict(raw: str) -> ClaimVerdict:
     """Normalise the LLM's verdict string into a ``ClaimVerdict`` enum."""
@@ -30,13 +62,12 @@ def _safe_confidence(val: Any) -> float:
         return 0.5
 
 
-async def verify_claims(claims: list[str]) -> list[ClaimAnalysis]:
-    """Verify each claim and return structured ``ClaimAnalysis`` objects."""
-    if not claims:
-        return []
-
+async def _verify_batch(claims: list[str]) -> list[ClaimAnalysis]:
+    """Verify *claims* with a single LLM call."""
     user_msg = "Claims to verify:\n" + "\n".join(f"- {c}" for c in claims)
-    data = await chat_completion_json(CLAIM_VERIFICATION_PROMPT, user_msg)
+    data = await chat_completion_json(
+        CLAIM_VERIFICATION_PROMPT, user_msg, json_schema=_VERIFICATION_SCHEMA,
+    )
 
     results: list[dict[str, Any]] = data.get("results", [])
     analyses: list[ClaimAnalysis] = []
@@ -56,3 +87,40 @@ async def verify_claims(claims: list[str]) -> list[ClaimAnalysis]:
             logger.exception("Failed to parse claim result: %s", item)
 
     return analyses
+
+
+# One limiter per event loop, shared by every request the loop serves (an
+# asyncio.Semaphore is bound to the loop it is first used on)
+_slots: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+
+
+def _verification_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _slots.get(loop)
+    if sem is None:
+        sem = _slots[loop] = asyncio.Semaphore(max(1, settings.verification_concurrency))
+    return sem
+
+
+async def verify_claims(claims: list[str]) -> list[ClaimAnalysis]:
+    """Verify each claim and return structured ``ClaimAnalysis`` objects.
+
+    Sets of up to ``settings.verification_batch_size`` claims go out as one
+    batched call.  Larger sets are verified one claim per call and returned
+    in input order; at most ``settings.verification_concurrency`` of those
+    calls are in flight across all concurrent requests in the process.
+    """
+    if not claims:
+        return []
+
+    if len(claims) <= settings.verification_batch_size:
+        return await _verify_batch(claims)
+
+    sem = _verification_slots()
+
+    async def _verify_one(claim: str) -> list[ClaimAnalysis]:
+        async with sem:
+            return await _verify_batch([claim])
+
+    per_claim = await asyncio.gather(*(_verify_one(c) for c in claims))
+    return [a for analyses in per_claim for a in analyses]
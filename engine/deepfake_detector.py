@@ -1,7 +1,8 @@
 """Deepfake image detection module.
 
 Loads an EfficientNet-B0 binary classifier (Deepfake vs Real) and exposes
-a single `predict_deepfake()` function for inference.
+`predict_deepfake()` (sync, single image) and `predict_deepfake_async()`
+(dynamically batched) for inference.
 
 Class mapping:
     0 → Deepfake
@@ -10,29 +11,74 @@ Class mapping:
 Architecture decisions:
     - Model loaded once at startup via `load_model()` — avoids per-request I/O.
     - Preprocessing uses ImageNet normalization (EfficientNet standard).
-    - Softmax applied to raw logits for calibrated probabilities.
-    - All inference runs under `torch.no_grad()` for speed + memory efficiency.
+      On CUDA, JPEGs are decoded with nvJPEG and resized/normalised on the
+      GPU; other formats (and nvJPEG failures) fall back to PIL.
+    - Softmax applied to raw logits for calibrated probabilities — computed in
+      closed form on the host (2 classes), so no softmax/argmax kernels run.
+    - All inference runs under `torch.inference_mode()` — no autograd or
+      version-counter bookkeeping on produced tensors.
     - GPU auto-detection: uses CUDA when available, falls back to CPU.
+    - torch / torchvision are imported lazily (in `load_model()` and the
+      inference helpers) so importing this module stays cheap.
+    - On CUDA the model is compiled with `torch.compile(mode="reduce-overhead")`
+      so the forward replays as a single CUDA graph instead of ~200
+      individual kernel launches.  One graph is captured per batch bucket
+      (1, 2, 4, … up to ``deepfake_max_batch``) and partial batches are padded
+      only to the next bucket, so a lone request still runs at batch 1.
+      Inputs are copied into a persistent buffer to keep the captured
+      graphs' addresses stable.  CUDA-graph trees are thread-local, so
+      warmup and every forward pass run on one dedicated inference thread.
+    - Model and input use `channels_last` (NHWC) memory format; on CUDA cuDNN
+      autotuning is enabled.
+    - On CUDA weights and inputs are FP16 (tensor-core MMA, half the weight
+      bandwidth); logits are converted to FP32 on the host.
+    - Async requests decode + transform on a worker thread (pinned host
+      memory on CUDA) so the event loop is never blocked by PIL.
+    - On CPU, an INT8 statically-quantized TorchScript model
+      (``deepfake_model_int8.pt``, produced offline by `export_int8_model()`)
+      is used instead of FP32 when present.
+    - Concurrent async requests are coalesced by a background batcher: images
+      arriving within ``deepfake_batch_timeout_ms`` of each other (up to
+      ``deepfake_max_batch``) share a single forward pass.
 """
 
 from __future__ import annotations
 
+import asyncio
 import io
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
 
-import torch
-import torch.nn.functional as F
 from PIL import Image
-from torchvision import transforms, models
+
+from config import settings
+from engine.probability import softmax2
+from services.batcher import MicroBatcher
+
+if TYPE_CHECKING:
+    import torch
+    from torchvision import transforms
 
 logger = logging.getLogger("clarix.deepfake")
 
 # ── Module-level state (populated by load_model) ──────────────────────
 
-_model: torch.nn.Module | None = None
-_device: torch.device | None = None
-_transform: transforms.Compose | None = None
+_model: "torch.nn.Module | None" = None
+_device: "torch.device | None" = None
+_transform: "transforms.Compose | None" = None
+_input_buf: "torch.Tensor | None" = None
+_mean: "torch.Tensor | None" = None  # [3, 1, 1] on _device, for the GPU preprocess path
+_std: "torch.Tensor | None" = None
+_batch_buckets: tuple[int, ...] = ()  # compiled batch sizes; empty → eager, any size
+_forward_lock = threading.Lock()  # guards _input_buf
+
+# Graph capture (in _compile_model) and replay (in _forward) must happen on
+# the same thread, or the graphs are re-recorded per thread with their own
+# memory pools — so all model execution goes through this single worker.
+_inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="deepfake-infer")
 
 # Class index → label
 CLASS_LABELS = {0: "Deepfake", 1: "Real"}
@@ -40,30 +86,133 @@ CLASS_LABELS = {0: "Deepfake", 1: "Real"}
 # Default model path (relative to project root)
 DEFAULT_MODEL_PATH = Path(__file__).resolve().parent.parent / "image_model" / "deepfake_model.pth"
 
+# Per-image network input shape (channels, height, width)
+INPUT_SHAPE = (3, 224, 224)
+
+# ImageNet normalisation constants
+_IMAGENET_MEAN = [0.485, 0.456, 0.406]
+_IMAGENET_STD = [0.229, 0.224, 0.225]
+
+_JPEG_MAGIC = b"\xff\xd8\xff"
+
 
 # ── Preprocessing pipeline ─────────────────────────────────────────────
 
 def _build_transform() -> transforms.Compose:
     """ImageNet-standard preprocessing for EfficientNet-B0 (224×224)."""
+    from torchvision import transforms
+
     return transforms.Compose([
         transforms.Resize((224, 224)),
         transforms.ToTensor(),
-        transforms.Normalize(
-            mean=[0.485, 0.456, 0.406],
-            std=[0.229, 0.224, 0.225],
-        ),
+        transforms.Normalize(mean=_IMAGENET_MEAN, std=_IMAGENET_STD),
     ])
 
 
+def _gpu_preprocess(image_bytes: bytes) -> torch.Tensor:
+    """Decode a JPEG with nvJPEG and resize + normalise on the GPU.
+
+    Equivalent to ``_build_transform()`` but never leaves the device.
+    Raises ``RuntimeError`` if nvJPEG cannot decode the image.
+    """
+    import torch
+    import torch.nn.functional as F
+    from torchvision.io import ImageReadMode, decode_jpeg
+
+    raw = torch.frombuffer(bytearray(image_bytes), dtype=torch.uint8)
+    img = decode_jpeg(raw, mode=ImageReadMode.RGB, device=_device)  # [3, H, W] uint8
+    img = F.interpolate(
+        img.unsqueeze(0).float().div_(255),
+        size=INPUT_SHAPE[1:],
+        mode="bilinear",
+        align_corners=False,
+        antialias=True,
+    ).squeeze(0)
+    return img.sub_(_mean).div_(_std)
+
+
 # ── Model loading ──────────────────────────────────────────────────────
 
+def _build_model() -> torch.nn.Module:
+    """EfficientNet-B0 with the 2-class classifier head used in training."""
+    import torch
+    from torchvision import models
+
+    model = models.efficientnet_b0(weights=None)
+    in_features = model.classifier[1].in_features
+    model.classifier[1] = torch.nn.Sequential(
+        torch.nn.Linear(in_features, 256),
+        torch.nn.Dropout(0.3),
+        torch.nn.ReLU(),
+        torch.nn.Linear(256, 2),
+    )
+    return model
+
+
+def _load_state_dict(path: Path) -> dict[str, torch.Tensor]:
+    """Load checkpoint weights without a full pickle copy in host RAM.
+
+    Prefers a ``.safetensors`` file next to *path* (zero-copy mmap, tensors
+    placed directly on ``_device``); otherwise memory-maps the ``.pth``.
+    """
+    import torch
+
+    st_path = path.with_suffix(".safetensors")
+    if st_path.exists():
+        from safetensors.torch import load_file
+
+        logger.info("Loading deepfake weights from %s", st_path)
+        return load_file(str(st_path), device=str(_device))
+    return torch.load(path, map_location=_device, weights_only=True, mmap=True)
+
+
+def _bucket_sizes(max_batch: int) -> tuple[int, ...]:
+    """Powers of two below *max_batch*, then *max_batch* itself."""
+    sizes = []
+    size = 1
+    while size < max_batch:
+        sizes.append(size)
+        size *= 2
+    return (*sizes, max_batch)
+
+
+def _compile_model(
+    model: torch.nn.Module, example: torch.Tensor, buckets: tuple[int, ...],
+) -> torch.nn.Module:
+    """Compile *model* for CUDA-graph replay, falling back to eager on failure.
+
+    A few warmup passes per batch bucket run here (on ``example[:bucket]``)
+    so compilation and graph capture happen at startup rather than on the
+    first request of each size.
+    """
+    import torch
+
+    try:
+        compiled = torch.compile(model, mode="reduce-overhead", fullgraph=True, dynamic=False)
+        with torch.inference_mode():
+            for bucket in buckets:
+                for _ in range(3):
+                    compiled(example[:bucket])
+    except Exception as exc:
+        logger.warning("torch.compile failed — running deepfake model in eager mode: %s", exc)
+        return model
+    logger.info("Deepfake model compiled (reduce-overhead / CUDA graphs)")
+    return compiled
+
+
 def load_model(model_path: str | Path | None = None) -> None:
     """Load the EfficientNet-B0 deepfake classifier from disk.
 
-    Called once during FastAPI lifespan startup.  Sets module-level
-    ``_model``, ``_device``, and ``_transform``.
+    Called once from a worker thread during FastAPI lifespan startup.  Sets
+    module-level ``_device``, ``_transform`` and ``_input_buf``, and
+    ``_model`` last, so ``is_loaded()`` only turns true once it is usable.
+
+    torch / torchvision are imported here rather than at module top so
+    workers that never serve deepfake requests skip the CUDA / cuDNN init.
     """
-    global _model, _device, _transform
+    import torch
+
+    global _model, _device, _transform, _input_buf, _mean, _std, _batch_buckets
 
     path = Path(model_path) if model_path else DEFAULT_MODEL_PATH
 
@@ -74,28 +223,102 @@ def load_model(model_path: str | Path | None = None) -> None:
     _device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     logger.info("Deepfake detector device: %s", _device)
 
-    # Build EfficientNet-B0 with modified classifier head (2 classes)
-    _model = models.efficientnet_b0(weights=None)
-    in_features = _model.classifier[1].in_features
-    _model.classifier[1] = torch.nn.Sequential(
-        torch.nn.Linear(in_features, 256),
-        torch.nn.Dropout(0.3),
-        torch.nn.ReLU(),
-        torch.nn.Linear(256, 2),
-    )
+    if _device.type == "cuda":
+        # Fixed 224×224 input → let cuDNN autotune conv algorithms once
+        torch.backends.cudnn.benchmark = True
+
+    dtype = torch.float16 if _device.type == "cuda" else torch.float32
+    int8_path = _int8_path(path)
+
+    if _device.type == "cpu" and settings.deepfake_int8 and int8_path.exists():
+        # Pre-quantized TorchScript artefact (see export_int8_model)
+        model = torch.jit.load(str(int8_path), map_location=_device)
+        model.eval()
+        path = int8_path
+    else:
+        # Build EfficientNet-B0 with modified classifier head (2 classes)
+        model = _build_model()
+
+        # Load trained weights
+        model.load_state_dict(_load_state_dict(path))
+
+        # Eval mode — disables dropout / batchnorm training behaviour
+        model.eval()
+        model.to(_device, dtype=dtype, memory_format=torch.channels_last)  # NHWC → tensor-core conv kernels
+
+    # Persistent input buffer sized for a full batch — each image copies into
+    # its row (NCHW → NHWC and FP32 → FP16 happen on copy)
+    max_batch = max(1, settings.deepfake_max_batch)
+    input_buf = torch.zeros(
+        (max_batch, *INPUT_SHAPE), device=_device, dtype=dtype,
+    ).to(memory_format=torch.channels_last)
+
+    batch_buckets: tuple[int, ...] = ()
+    if _device.type == "cuda" and settings.deepfake_compile:
+        buckets = _bucket_sizes(max_batch)
+        compiled = _inference_executor.submit(_compile_model, model, input_buf, buckets).result()
+        # Captured graphs have fixed shapes, so batches are padded to a bucket
+        if compiled is not model:
+            batch_buckets = buckets
+        model = compiled
+
+    # Build preprocessing transform (+ device-side constants for nvJPEG path)
+    _transform = _build_transform()
+    _mean = torch.tensor(_IMAGENET_MEAN, device=_device).view(3, 1, 1)
+    _std = torch.tensor(_IMAGENET_STD, device=_device).view(3, 1, 1)
+    _input_buf, _batch_buckets = input_buf, batch_buckets
+    _model = model
 
-    # Load trained weights
-    state_dict = torch.load(path, map_location=_device, weights_only=True)
-    _model.load_state_dict(state_dict)
+    logger.info("Deepfake detection model loaded successfully from %s", path)
 
-    # Eval mode — disables dropout / batchnorm training behaviour
-    _model.eval()
-    _model.to(_device)
 
-    # Build preprocessing transform
-    _transform = _build_transform()
+def _int8_path(model_path: Path) -> Path:
+    return model_path.with_name(f"{model_path.stem}_int8.pt")
 
-    logger.info("Deepfake detection model loaded successfully from %s", path)
+
+def export_int8_model(
+    calibration_images: Iterable[bytes],
+    model_path: str | Path | None = None,
+    out_path: str | Path | None = None,
+) -> Path:
+    """Statically quantize the classifier to INT8 for CPU serving (offline).
+
+    Runs FX post-training static quantization with the x86 (FBGEMM/oneDNN)
+    qconfig, calibrated on *calibration_images* (raw bytes of a few hundred
+    representative real + deepfake images), and saves the result as
+    TorchScript next to the FP32 checkpoint.  ``load_model`` picks it up
+    automatically on CPU when ``settings.deepfake_int8`` is enabled.
+    """
+    import torch
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    path = Path(model_path) if model_path else DEFAULT_MODEL_PATH
+    out = Path(out_path) if out_path else _int8_path(path)
+
+    model = _build_model()
+    model.load_state_dict(torch.load(path, map_location="cpu", weights_only=True))
+    model.eval()
+
+    transform = _build_transform()
+    example = torch.zeros((1, *INPUT_SHAPE))
+    prepared = prepare_fx(model, get_default_qconfig_mapping("x86"), example_inputs=(example,))
+
+    n = 0
+    with torch.no_grad():
+        for data in calibration_images:
+            image = Image.open(io.BytesIO(data)).convert("RGB")
+            prepared(transform(image).unsqueeze(0))
+            n += 1
+    if n == 0:
+        raise ValueError("At least one calibration image is required")
+
+    quantized = convert_fx(prepared)
+    with torch.no_grad():
+        torch.jit.save(torch.jit.trace(quantized, example), str(out))
+
+    logger.info("INT8 deepfake model (%d calibration images) saved to %s", n, out)
+    return out
 
 
 def is_loaded() -> bool:
@@ -105,6 +328,60 @@ def is_loaded() -> bool:
 
 # ── Inference ──────────────────────────────────────────────────────────
 
+def _preprocess(image_bytes: bytes) -> torch.Tensor:
+    """Decode *image_bytes* into a normalised ``[3, 224, 224]`` tensor.
+
+    On CUDA, JPEGs are decoded straight to the GPU; anything else goes
+    through PIL and is returned in pinned memory so the H2D copy in
+    ``_forward`` can be issued asynchronously.
+    """
+    if _device.type == "cuda" and image_bytes[:3] == _JPEG_MAGIC:
+        try:
+            return _gpu_preprocess(image_bytes)
+        except RuntimeError as exc:
+            logger.debug("nvJPEG decode failed, falling back to PIL: %s", exc)
+
+    try:
+        image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    except Exception as exc:
+        raise ValueError(f"Could not decode image: {exc}") from exc
+    tensor = _transform(image)
+    return tensor.pin_memory() if _device.type == "cuda" else tensor
+
+
+def _forward(tensors: list[torch.Tensor]) -> list[dict]:
+    """Run one forward pass over up to ``deepfake_max_batch`` preprocessed images."""
+    import torch
+
+    n = len(tensors)
+    # Smallest captured batch size that fits; stale rows past n are ignored
+    size = next((b for b in _batch_buckets if b >= n), n)
+    with _forward_lock, torch.inference_mode():
+        for i, t in enumerate(tensors):
+            _input_buf[i].copy_(t, non_blocking=True)
+        logits = _model(_input_buf[:size])[:n]  # [n, 2]
+        rows = logits.float().cpu().tolist()                                   # one D2H sync
+    return [_to_result(l0, l1) for l0, l1 in rows]
+
+
+def _to_result(deepfake_logit: float, real_logit: float) -> dict:
+    # argmax on logits == argmax on probabilities
+    p_deepfake, p_real = softmax2(deepfake_logit, real_logit)
+
+    deepfake_prob = p_deepfake * 100
+    real_prob = p_real * 100
+    predicted_idx = 0 if deepfake_logit >= real_logit else 1
+    label = CLASS_LABELS[predicted_idx]
+    confidence = deepfake_prob if predicted_idx == 0 else real_prob
+
+    return {
+        "label": label,
+        "confidence": round(confidence, 2),
+        "deepfake_probability": round(deepfake_prob, 2),
+        "real_probability": round(real_prob, 2),
+    }
+
+
 def predict_deepfake(image_bytes: bytes) -> dict:
     """Run deepfake detection on raw image bytes.
 
@@ -118,31 +395,47 @@ def predict_deepfake(image_bytes: bytes) -> dict:
         RuntimeError: if the model has not been loaded yet.
         ValueError:   if the image cannot be read / decoded.
     """
-    if _model is None or _transform is None or _device is None:
+    if _model is None or _transform is None or _device is None or _input_buf is None:
         raise RuntimeError("Deepfake model not loaded — call load_model() first")
 
-    # ── Read & preprocess image ────────────────────────────────────────
-    try:
-        image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-    except Exception as exc:
-        raise ValueError(f"Could not decode image: {exc}") from exc
+    return _inference_executor.submit(_forward, [_preprocess(image_bytes)]).result()[0]
 
-    tensor = _transform(image).unsqueeze(0).to(_device)  # [1, 3, 224, 224]
 
-    # ── Forward pass ───────────────────────────────────────────────────
-    with torch.no_grad():
-        logits = _model(tensor)                        # [1, 2]
-        probs = F.softmax(logits, dim=1).squeeze()     # [2]
+# ── Dynamic batching ───────────────────────────────────────────────────
 
-    deepfake_prob = float(probs[0]) * 100
-    real_prob = float(probs[1]) * 100
-    predicted_idx = int(torch.argmax(probs))
-    label = CLASS_LABELS[predicted_idx]
-    confidence = float(probs[predicted_idx]) * 100
+async def start_batcher() -> None:
+    """Start the background batching worker.  Called from FastAPI lifespan."""
+    await _batcher.start()
 
-    return {
-        "label": label,
-        "confidence": round(confidence, 2),
-        "deepfake_probability": round(deepfake_prob, 2),
-        "real_probability": round(real_prob, 2),
-    }
+
+async def stop_batcher() -> None:
+    """Cancel the background batching worker."""
+    await _batcher.stop()
+
+
+async def predict_deepfake_async(image_bytes: bytes) -> dict:
+    """Async variant of ``predict_deepfake`` that joins the dynamic batch.
+
+    Falls back to a direct (unbatched) forward pass when the batcher is not
+    running.  Raises the same exceptions as ``predict_deepfake``.
+    """
+    if _model is None or _transform is None or _device is None or _input_buf is None:
+        raise RuntimeError("Deepfake model not loaded — call load_model() first")
+
+    # PIL decode + resize is tens of ms of CPU work — keep it off the event loop
+    tensor = await asyncio.to_thread(_preprocess, image_bytes)
+
+    if not _batcher.running:
+        loop = asyncio.get_running_loop()
+        return (await loop.run_in_executor(_inference_executor, _forward, [tensor]))[0]
+
+    return await _batcher.submit(tensor)
+
+
+_batcher = MicroBatcher(
+    _forward,
+    max_batch=settings.deepfake_max_batch,
+    max_wait_ms=settings.deepfake_batch_timeout_ms,
+    name="Deepfake",
+    executor=_inference_executor,
+)
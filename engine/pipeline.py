@@ -5,6 +5,7 @@ from __future__ import annotations
 import asyncio
 import logging
 import time
+from typing import Any
 
 from engine.summarizer import summarize
 from engine.claim_extractor import extract_claims
@@ -14,7 +15,7 @@ from engine.scorer import compute_score
 from engine.verdict import determine_verdict
 from engine.guidance import generate_guidance
 from engine.heuristics import assess_source_credibility, assess_evidence_quality
-from schemas.response import CredibilityCategory, VerifyResponse
+from schemas.response import BiasSignal, ClaimAnalysis, ClaimVerdict, CredibilityCategory, VerifyResponse
 
 logger = logging.getLogger("clarix.pipeline")
 
@@ -58,55 +59,20 @@ _CONTENT_TYPE_ADJUSTMENTS: dict[str, int] = {
 }
 
 
-async def run_pipeline(
-    content: str,
+def _score_and_build(
+    claim_analyses: list[ClaimAnalysis],
+    bias_signals: list[BiasSignal],
     *,
-    url: str | None = None,
-    title: str | None = None,
-    content_type: str | None = None,
-    request_id: str | None = None,
-) -> VerifyResponse:
-    """Execute the full seven-step Clarix verification pipeline.
-
-    Parameters
-    ----------
-    content : str
-        Raw text extracted from the user's screen.
-    url : str | None
-        Optional source URL for credibility heuristics.
-    title : str | None
-        Optional article title (prepended to content for LLM context).
-    content_type : str | None
-        Content type hint for scoring adjustment (satire/opinion/breaking).
-    request_id : str | None
-        Caller's request ID echoed back in the response.
+    url: str | None,
+    content: str,
+    content_type: str | None,
+) -> dict[str, Any]:
+    """Steps 5 + 6 and the derived Node-compatible fields.
 
-    Returns
-    -------
-    VerifyResponse
-        Structured verification result.
+    Pure and synchronous so ``run_pipeline`` can push it off the event loop.
+    Returns the ``VerifyResponse`` fields that depend only on the claim
+    analyses, bias signals and source heuristics.
     """
-    t0 = time.perf_counter()
-
-    # Prepend title to content when available for richer LLM context
-    analysis_text = f"Title: {title}\n\n{content}" if title else content
-
-    # ── Step 1 + Step 2 + Step 4 (independent — run in parallel) ───────
-    summary_task = asyncio.create_task(summarize(analysis_text))
-    claims_task = asyncio.create_task(extract_claims(analysis_text))
-    bias_task = asyncio.create_task(analyze_bias(analysis_text))
-
-    summary = await summary_task
-    raw_claims = await claims_task
-    bias_signals = await bias_task
-
-    logger.info("Steps 1/2/4 complete — %d claims, %d bias signals", len(raw_claims), len(bias_signals))
-
-    # ── Step 3 — Verify extracted claims ───────────────────────────────
-    claim_analyses = await verify_claims(raw_claims)
-
-    logger.info("Step 3 complete — %d analyses", len(claim_analyses))
-
     # ── Step 5 — Numerical scoring ─────────────────────────────────────
     source_cred = assess_source_credibility(url, content)
     evidence_qual = assess_evidence_quality(
@@ -128,20 +94,20 @@ async def run_pipeline(
     # ── Step 6 — Verdict ───────────────────────────────────────────────
     verdict = determine_verdict(score)
 
-    # ── Step 7 — User guidance ─────────────────────────────────────────
-    how_to_verify = await generate_guidance(summary, claim_analyses, bias_signals)
-
     # ── Compute Node-compatible fields ─────────────────────────────────
-    supported = sum(1 for c in claim_analyses if c.verdict.value == "SUPPORTED")
-    contradicted = sum(1 for c in claim_analyses if c.verdict.value == "CONTRADICTED")
-    unverified = sum(1 for c in claim_analyses if c.verdict.value == "UNVERIFIED")
+    supported = contradicted = unverified = 0
+    conf_total = 0.0
+    for c in claim_analyses:
+        conf_total += c.confidence
+        if c.verdict == ClaimVerdict.SUPPORTED:
+            supported += 1
+        elif c.verdict == ClaimVerdict.CONTRADICTED:
+            contradicted += 1
+        elif c.verdict == ClaimVerdict.UNVERIFIED:
+            unverified += 1
 
     # Overall confidence = average of per-claim confidences (fallback 0.5)
-    overall_confidence = (
-        sum(c.confidence for c in claim_analyses) / len(claim_analyses)
-        if claim_analyses
-        else 0.5
-    )
+    overall_confidence = conf_total / len(claim_analyses) if claim_analyses else 0.5
 
     # Positive / negative signals derived from bias analysis + claim stats
     positive_signals: list[str] = []
@@ -175,24 +141,103 @@ async def run_pipeline(
         f"Final authenticity score: {score}/100."
     )
 
+    return {
+        "authenticity_score": score,
+        "verdict": verdict,
+        "reasoning": reasoning,
+        # Node-server-compatible fields
+        "overall_confidence": round(overall_confidence, 3),
+        "category": _score_to_category(score),
+        "label": verdict.value,
+        "color": _score_to_color(score),
+        "source_quality": _source_cred_to_quality(source_cred),
+        "positive_signals": positive_signals,
+        "negative_signals": negative_signals,
+    }
+
+
+async def run_pipeline(
+    content: str,
+    *,
+    url: str | None = None,
+    title: str | None = None,
+    content_type: str | None = None,
+    request_id: str | None = None,
+) -> VerifyResponse:
+    """Execute the full seven-step Clarix verification pipeline.
+
+    Parameters
+    ----------
+    content : str
+        Raw text extracted from the user's screen.
+    url : str | None
+        Optional source URL for credibility heuristics.
+    title : str | None
+        Optional article title (prepended to content for LLM context).
+    content_type : str | None
+        Content type hint for scoring adjustment (satire/opinion/breaking).
+    request_id : str | None
+        Caller's request ID echoed back in the response.
+
+    Returns
+    -------
+    VerifyResponse
+        Structured verification result.
+    """
+    t0 = time.perf_counter()
+
+    # Prepend title to content when available for richer LLM context
+    analysis_text = f"Title: {title}\n\n{content}" if title else content
+
+    # ── Steps 1, 2→3, 4 ────────────────────────────────────────────────
+    # Summary and bias analysis are independent.  Claim verification only
+    # needs the extracted claims, so it is chained onto extraction and runs
+    # while summary / bias are still in flight.
+    async def _extract_and_verify() -> list[ClaimAnalysis]:
+        raw_claims = await extract_claims(analysis_text)
+        logger.info("Step 2 complete — %d claims", len(raw_claims))
+        return await verify_claims(raw_claims)
+
+    summary, bias_signals, claim_analyses = await asyncio.gather(
+        summarize(analysis_text),
+        analyze_bias(analysis_text),
+        _extract_and_verify(),
+    )
+
+    logger.info(
+        "Steps 1/3/4 complete — %d analyses, %d bias signals",
+        len(claim_analyses),
+        len(bias_signals),
+    )
+
+    # ── Steps 5/6 (deterministic, CPU-bound) + Step 7 (LLM) ────────────
+    # Scoring runs on a worker thread so it doesn't hold the event loop;
+    # guidance only needs the step 1-4 outputs and runs alongside it.
+    how_to_verify, result = await asyncio.gather(
+        generate_guidance(summary, claim_analyses, bias_signals),
+        asyncio.to_thread(
+            _score_and_build,
+            claim_analyses,
+            bias_signals,
+            url=url,
+            content=content,
+            content_type=content_type,
+        ),
+    )
+
     elapsed = time.perf_counter() - t0
-    logger.info("Pipeline complete in %.2fs — score %d/100 → %s", elapsed, score, verdict.value)
+    logger.info(
+        "Pipeline complete in %.2fs — score %d/100 → %s",
+        elapsed,
+        result["authenticity_score"],
+        result["verdict"].value,
+    )
 
     return VerifyResponse(
         summary=summary,
         claims=claim_analyses,
         bias_signals=bias_signals,
-        authenticity_score=score,
-        verdict=verdict,
-        reasoning=reasoning,
         how_to_verify=how_to_verify,
-        # Node-server-compatible fields
-        overall_confidence=round(overall_confidence, 3),
-        category=_score_to_category(score),
-        label=verdict.value,
-        color=_score_to_color(score),
-        source_quality=_source_cred_to_quality(source_cred),
-        positive_signals=positive_signals,
-        negative_signals=negative_signals,
         request_id=request_id,
+        **result,
     )
@@ -0,0 +1,20 @@
+"""Shared probability helpers for the two-class model heads."""
+
+from __future__ import annotations
+
+import math
+
+
+def softmax2(logit0: float, logit1: float) -> tuple[float, float]:
+    """Softmax over two logits in closed form: ``p0 = sigmoid(logit0 - logit1)``.
+
+    Branches on the sign of the difference so ``exp()`` never overflows,
+    even for logits hundreds apart.
+    """
+    d = logit0 - logit1
+    if d >= 0:
+        p0 = 1.0 / (1.0 + math.exp(-d))
+    else:
+        e = math.exp(d)
+        p0 = e / (1.0 + e)
+    return p0, 1.0 - p0
@@ -8,6 +8,22 @@ from __future__ import annotations
 
 from schemas.response import ClaimAnalysis, ClaimVerdict, BiasSignal
 
+# Substring → penalty.  Checked in insertion order; the first key found in a
+# signal's name wins.
+_SIGNAL_PENALTIES: dict[str, int] = {
+    "sensationalism": -10,
+    "context omission": -8,
+    "missing context": -8,
+    "misleading visual": -12,
+    "misleading image": -12,
+    "clickbait": -8,
+    "loaded language": -6,
+    "emotional language": -6,
+    "selective statistics": -8,
+    "political slant": -6,
+    "ideological slant": -6,
+}
+
 
 def compute_score(
     claims: list[ClaimAnalysis],
@@ -61,20 +77,6 @@ def compute_score(
     score += evidence_quality
 
     # ── manipulation signal penalties ──────────────────────────────────
-    _SIGNAL_PENALTIES: dict[str, int] = {
-        "sensationalism": -10,
-        "context omission": -8,
-        "missing context": -8,
-        "misleading visual": -12,
-        "misleading image": -12,
-        "clickbait": -8,
-        "loaded language": -6,
-        "emotional language": -6,
-        "selective statistics": -8,
-        "political slant": -6,
-        "ideological slant": -6,
-    }
-
     for sig in bias_signals:
         sig_lower = sig.signal.lower()
         penalty_applied = False
@@ -6,20 +6,27 @@ Designed to run as an internal service consumed by the Node.js Express backend.
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
 import secrets
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 
 from fastapi import Depends, FastAPI, File, Header, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from config import settings
 from engine.pipeline import run_pipeline
+from engine.probability import softmax2
 from engine.deepfake_detector import (
     load_model as load_deepfake_model,
-    predict_deepfake,
+    predict_deepfake_async,
     is_loaded as deepfake_is_loaded,
+    start_batcher as start_deepfake_batcher,
+    stop_batcher as stop_deepfake_batcher,
 )
 from schemas.request import VerifyRequest, PredictRequest
 from schemas.response import (
@@ -29,6 +36,9 @@ from schemas.response import (
     DeepfakeResponse,
     CombinedAnalysisResponse,
 )
+from services import llm_service
+from services.batcher import MicroBatcher
+from services.llm_cache import TTLCache, content_digest
 
 # ── Logging ────────────────────────────────────────────────────────────
 
@@ -44,45 +54,250 @@ logger = logging.getLogger("clarix")
 
 _hf_tokenizer = None
 _hf_model = None
+_hf_graphs: dict = {}  # padded sequence length → frozen TorchScript graph
 HF_MODEL_PATH = "yashvasudeva/text-based-fake-news-detector"
 
+# Every classifier forward pass runs on this one thread: keeps CPU-bound
+# torch work off the event loop and serialises it so intra-op threads aren't
+# oversubscribed by concurrent calls.
+inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hf-infer")
+HF_MAX_LENGTH = 256
+# Inputs are padded up to one of these lengths so only a handful of shapes
+# ever reach the model (one traced graph + warm allocator state per bucket)
+HF_SEQ_BUCKETS = (32, 64, 128, HF_MAX_LENGTH)
 
-def _load_hf_model():
-    """Load the HuggingFace model. Called once at startup."""
+
+def _trace_hf_model(model, tokenizer, seq_len: int):
+    """Trace + freeze *model* for inputs padded to *seq_len* tokens.
+
+    The dummy input is real tokenizer output padded to *seq_len*, so the
+    general attention-mask path (not the all-ones shortcut) is traced.
+    Returns ``None`` on failure, leaving that length on the eager path.
+    """
+    import torch
+
+    dummy = tokenizer(
+        "Clarix warmup.",
+        return_tensors="pt",
+        truncation=True,
+        padding="max_length",
+        max_length=seq_len,
+    )
+    example = (dummy["input_ids"], dummy["attention_mask"])
+    try:
+        with torch.no_grad():
+            graph = torch.jit.freeze(torch.jit.trace(model, example).eval())
+            try:
+                graph = torch.jit.optimize_for_inference(graph)
+            except Exception as exc:
+                logger.debug("optimize_for_inference skipped for seq_len=%d: %s", seq_len, exc)
+            graph(*example)  # first call runs the JIT's profiling pass
+    except Exception as exc:
+        logger.warning("TorchScript trace failed for seq_len=%d — using eager model: %s", seq_len, exc)
+        return None
+    return graph
+
+
+def _hf_num_threads() -> int:
+    # One forward at a time per process (see inference_executor); with N
+    # worker processes set HF_NUM_THREADS to cores // N to avoid N× oversubscription
+    return settings.hf_num_threads or os.cpu_count() or 1
+
+
+def _configure_torch_threads(num_threads: int) -> None:
+    import torch
+
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # already fixed once any inter-op work has run
+
+
+def _load_hf_model(num_threads: int | None = None):
+    """Load the HuggingFace model. Called once at startup, off the event loop.
+
+    Everything is built in locals and published at the end, so requests
+    that arrive mid-load get a 503 rather than a half-prepared model.
+    """
     global _hf_tokenizer, _hf_model
     import torch
     from transformers import AutoTokenizer, AutoModelForSequenceClassification
 
+    # Intra-op parallelism for the single forward in flight, no inter-op scheduling
+    _configure_torch_threads(num_threads or _hf_num_threads())
+
     logger.info("Loading HuggingFace model: %s", HF_MODEL_PATH)
-    _hf_tokenizer = AutoTokenizer.from_pretrained(HF_MODEL_PATH)
-    _hf_model = AutoModelForSequenceClassification.from_pretrained(HF_MODEL_PATH)
-    _hf_model.eval()
+    tokenizer = AutoTokenizer.from_pretrained(HF_MODEL_PATH, use_fast=True)
+    if not tokenizer.is_fast:
+        logger.warning("No Rust tokenizer available for %s — tokenization will be slow", HF_MODEL_PATH)
+    model = AutoModelForSequenceClassification.from_pretrained(
+        HF_MODEL_PATH,
+        torchscript=settings.hf_torchscript,  # tuple outputs (traceable); logits are output[0]
+        low_cpu_mem_usage=True,  # materialise weights once instead of init + copy
+    )
+    model.eval()
+
+    if settings.hf_int8:
+        # W8A8 dynamic quantization of every nn.Linear (attention + MLP GEMMs)
+        if "x86" in torch.backends.quantized.supported_engines:
+            torch.backends.quantized.engine = "x86"  # FBGEMM / oneDNN VNNI kernels
+        model = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8,
+        )
+        logger.info("HuggingFace model quantized to INT8 (engine=%s)", torch.backends.quantized.engine)
+    elif settings.hf_bf16 and torch.ops.mkldnn._is_mkldnn_bf16_supported():
+        # Halves weight bandwidth; oneDNN runs the GEMMs on BF16 units.
+        # Without hardware support BF16 is emulated and slower, hence the check.
+        model = model.to(torch.bfloat16)
+        logger.info("HuggingFace model cast to BF16")
+
+    graphs = {}
+    if settings.hf_torchscript:
+        for seq_len in HF_SEQ_BUCKETS:
+            graph = _trace_hf_model(model, tokenizer, seq_len)
+            if graph is not None:
+                graphs[seq_len] = graph
+
+    _hf_graphs.clear()
+    _hf_graphs.update(graphs)
+    _hf_tokenizer = tokenizer
+    _hf_model = model  # readiness gate for /predict, so assigned last
     logger.info("HuggingFace model loaded successfully.")
 
 
-def _predict_fake_news(text: str) -> dict:
-    """Run inference with the HuggingFace fake news detector."""
+def _predict_fake_news_batch(texts: list[str]) -> list[dict]:
+    """Run inference with the HuggingFace fake news detector on *texts*."""
+    if settings.hf_int8 and len(texts) > 1:
+        # Dynamic quantization takes its activation scale from the whole input
+        # tensor, so batched scores would depend on the other texts and their
+        # padding; one row per forward keeps each result a function of its text
+        return [_predict_fake_news_batch([text])[0] for text in texts]
+
     import torch
 
-    inputs = _hf_tokenizer(
-        text,
-        return_tensors="pt",
-        truncation=True,
-        padding=True,
-        max_length=256,
+    # Tokenize once unpadded, then pad up to the smallest bucket that fits
+    encoded = _hf_tokenizer(texts, truncation=True, max_length=HF_MAX_LENGTH)
+    n_tokens = max(len(ids) for ids in encoded["input_ids"])
+    bucket = next(b for b in HF_SEQ_BUCKETS if b >= n_tokens)
+    # Graphs are traced at batch size 1; larger batches run eagerly
+    graph = _hf_graphs.get(bucket) if len(texts) == 1 else None
+    padded = _hf_tokenizer.pad(
+        encoded,
+        # Traced graphs expect the shape they were traced with
+        padding="max_length" if graph is not None else True,
+        max_length=bucket,
+        return_tensors="np",
     )
-    with torch.no_grad():
-        logits = _hf_model(**inputs).logits
+    # int64 NumPy arrays → tensors sharing the same memory (no copy)
+    inputs = {name: torch.from_numpy(arr) for name, arr in padded.items()}
+    with torch.inference_mode():
+        if graph is not None:
+            logits = graph(inputs["input_ids"], inputs["attention_mask"])[0]
+        else:
+            logits = _hf_model(**inputs)[0]
+
+    # One host transfer of the raw logits; softmax over two classes is
+    # cheaper in closed form than as tensor ops + NumPy scalar reads
+    return [_hf_result(real, fake) for real, fake in logits.tolist()]
+
 
-    probs = torch.softmax(logits, dim=1).squeeze().numpy()
+def _hf_result(real_logit: float, fake_logit: float) -> dict:
+    p_real, p_fake = softmax2(real_logit, fake_logit)
     return {
-        "label": "FAKE" if probs[1] > probs[0] else "REAL",
-        "confidence": round(float(max(probs)) * 100, 2),
-        "real_probability": round(float(probs[0]) * 100, 2),
-        "fake_probability": round(float(probs[1]) * 100, 2),
+        "label": "FAKE" if fake_logit > real_logit else "REAL",
+        "confidence": round(max(p_real, p_fake) * 100, 2),
+        "real_probability": round(p_real * 100, 2),
+        "fake_probability": round(p_fake * 100, 2),
     }
 
 
+def _predict_fake_news(text: str) -> dict:
+    """Run inference with the HuggingFace fake news detector."""
+    return _predict_fake_news_batch([text])[0]
+
+
+# Coalesces concurrent /predict requests into one batched forward pass
+_hf_batcher = MicroBatcher(
+    _predict_fake_news_batch,
+    max_batch=settings.hf_max_batch,
+    max_wait_ms=settings.hf_batch_timeout_ms,
+    name="HuggingFace",
+    executor=inference_executor,
+)
+
+
+# A text's result depends only on the text (quantized batches run row by
+# row), so results never go stale
+_hf_cache = TTLCache(settings.hf_cache_size, ttl=None)
+
+
+async def _classify_text(text: str) -> dict:
+    """Classify *text*, joining the micro-batch when the batcher is running.
+
+    Results are cached by content digest; callers must not mutate them.
+    """
+    key = content_digest(text)
+    cached = _hf_cache.get(key)
+    if cached is not None:
+        return cached
+    if _hf_batcher.running:
+        result = await _hf_batcher.submit(text)
+    else:
+        result = await asyncio.get_running_loop().run_in_executor(inference_executor, _predict_fake_news, text)
+    _hf_cache.set(key, result)
+    return result
+
+
+# ── /verify response cache ─────────────────────────────────────────────
+
+_verify_cache = TTLCache(settings.verify_cache_size, settings.llm_cache_ttl)
+_verify_inflight: dict[tuple, asyncio.Future] = {}
+
+
+async def _verify_cached(payload: VerifyRequest) -> VerifyResponse:
+    """Run the pipeline for *payload*, sharing results between identical requests.
+
+    Completed responses are served from ``_verify_cache``; a request that
+    arrives while an identical one is still running awaits the same task
+    instead of starting a second pipeline.  Every pipeline input is part of
+    the key (``content_type`` switches the satire/opinion scoring branch);
+    ``request_id`` is only echoed, so it is patched onto the shared result.
+    """
+    key = (content_digest(payload.content), payload.url, payload.title, payload.content_type)
+    result = _verify_cache.get(key)
+    if result is None:
+        task = _verify_inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(run_pipeline(
+                payload.content,
+                url=payload.url,
+                title=payload.title,
+                content_type=payload.content_type,
+                request_id=payload.request_id,
+            ))
+            _verify_inflight[key] = task
+            task.add_done_callback(lambda _: _verify_inflight.pop(key, None))
+        # shield: one client disconnecting must not cancel the others' run
+        result = await asyncio.shield(task)
+        _verify_cache.set(key, result)
+    if result.request_id != payload.request_id:
+        result = result.model_copy(update={"request_id": payload.request_id})
+    return result
+
+
+# Pre-fork servers (``gunicorn --preload``) import this module once in the
+# master and fork workers from it: loading here lets every worker share the
+# read-only weight pages copy-on-write instead of holding its own copy.
+# Single-threaded so no intra-op thread pool is live across fork();
+# workers raise the thread count in lifespan.
+if settings.hf_preload:
+    try:
+        _load_hf_model(num_threads=1)
+    except Exception as exc:
+        logger.warning("HuggingFace model preload failed — workers will load their own copy: %s", exc)
+
+
 # ── Internal-token auth dependency ─────────────────────────────────────
 
 async def verify_internal_token(
@@ -101,6 +316,20 @@ async def verify_internal_token(
 
 # ── Lifespan ───────────────────────────────────────────────────────────
 
+async def _load_hf_model_background() -> None:
+    try:
+        await asyncio.to_thread(_load_hf_model)
+    except Exception as exc:
+        logger.warning("HuggingFace model failed to load — /predict will be unavailable: %s", exc)
+
+
+async def _load_deepfake_model_background() -> None:
+    try:
+        await asyncio.to_thread(load_deepfake_model)
+    except Exception as exc:
+        logger.warning("Deepfake model failed to load — /detect-deepfake will be unavailable: %s", exc)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):  # noqa: ARG001
     logger.info(
@@ -109,19 +338,24 @@ async def lifespan(app: FastAPI):  # noqa: ARG001
         settings.openai_model,
         "enabled" if settings.internal_token else "disabled (dev)",
     )
-    # Load HuggingFace model at startup
-    try:
-        _load_hf_model()
-    except Exception as exc:
-        logger.warning("HuggingFace model failed to load — /predict will be unavailable: %s", exc)
-
-    # Load deepfake detection model at startup
-    try:
-        load_deepfake_model()
-    except Exception as exc:
-        logger.warning("Deepfake model failed to load — /detect-deepfake will be unavailable: %s", exc)
+    # Load both models in the background: the server starts accepting
+    # connections immediately, /predict and /detect-deepfake answer 503 until
+    # their model is ready (``hf_model_loaded`` / ``deepfake_model_loaded``
+    # in /health double as the readiness signals)
+    await _hf_batcher.start()
+    await start_deepfake_batcher()
+    loads = [asyncio.create_task(_load_deepfake_model_background())]
+    if _hf_model is None:
+        loads.append(asyncio.create_task(_load_hf_model_background()))
+    else:  # preloaded in the pre-fork master
+        _configure_torch_threads(_hf_num_threads())
 
     yield
+    for task in loads:
+        task.cancel()
+    await _hf_batcher.stop()
+    await stop_deepfake_batcher()
+    await llm_service.aclose()
     logger.info("Clarix pipeline shutting down.")
 
 
@@ -132,17 +366,17 @@ app = FastAPI(
     description="Evidence-based news verification engine with deepfake image detection — internal service for the Node.js backend.",
     version="0.3.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-# Parse allowed_origins (comma-separated string → list)
-_origins = [o.strip() for o in settings.allowed_origins.split(",") if o.strip()]
-
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=_origins,
+    allow_origins=settings.allowed_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # Explicit lists (not "*") let Starlette answer preflights from a fixed
+    # header set; these are all the browser dashboard and Node server send
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "X-Internal-Token"],
 )
 
 
@@ -166,12 +400,13 @@ async def health():
     description="Runs the yashvasudeva/text-based-fake-news-detector model "
     "and returns FAKE/REAL label with confidence scores.",
 )
-async def predict(payload: PredictRequest) -> PredictResponse:
+async def predict(payload: PredictRequest) -> ORJSONResponse:
     if _hf_model is None or _hf_tokenizer is None:
         raise HTTPException(status_code=503, detail="HuggingFace model not loaded")
     try:
-        result = _predict_fake_news(payload.text)
-        return PredictResponse(**result)
+        # Already PredictResponse-shaped; returning a Response skips
+        # FastAPI's response_model re-validation (the model is kept for docs)
+        return ORJSONResponse(await _classify_text(payload.text))
     except Exception as exc:
         logger.exception("Predict failed")
         raise HTTPException(status_code=500, detail=str(exc)) from exc
@@ -186,16 +421,10 @@ async def predict(payload: PredictRequest) -> PredictResponse:
     "Intended to be called by the Node.js Express server.",
     dependencies=[Depends(verify_internal_token)],
 )
-async def verify(payload: VerifyRequest) -> VerifyResponse:
+async def verify(payload: VerifyRequest) -> ORJSONResponse:
     try:
-        result = await run_pipeline(
-            payload.content,
-            url=payload.url,
-            title=payload.title,
-            content_type=payload.content_type,
-            request_id=payload.request_id,
-        )
-        return result
+        result = await _verify_cached(payload)
+        return ORJSONResponse(result.model_dump(mode="json"))
     except Exception as exc:
         logger.exception("Pipeline failed")
         raise HTTPException(status_code=500, detail=str(exc)) from exc
@@ -211,7 +440,7 @@ async def verify(payload: VerifyRequest) -> VerifyResponse:
     description="Accepts an image upload and returns Deepfake/Real prediction "
     "with confidence scores and probabilities.",
 )
-async def detect_deepfake(file: UploadFile = File(...)) -> DeepfakeResponse:
+async def detect_deepfake(file: UploadFile = File(...)) -> ORJSONResponse:
     # Guard: model must be loaded
     if not deepfake_is_loaded():
         raise HTTPException(status_code=503, detail="Deepfake detection model not loaded")
@@ -225,8 +454,7 @@ async def detect_deepfake(file: UploadFile = File(...)) -> DeepfakeResponse:
         if not image_bytes:
             raise HTTPException(status_code=400, detail="Empty file uploaded")
 
-        result = predict_deepfake(image_bytes)
-        return DeepfakeResponse(**result)
+        return ORJSONResponse(await predict_deepfake_async(image_bytes))
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except HTTPException:
@@ -255,7 +483,7 @@ async def analyze_combined(
     # Run text analysis if text provided
     if text and _hf_model is not None and _hf_tokenizer is not None:
         try:
-            raw = _predict_fake_news(text)
+            raw = await _classify_text(text)
             text_result = PredictResponse(**raw)
         except Exception as exc:
             logger.warning("Text analysis failed in combined endpoint: %s", exc)
@@ -265,7 +493,7 @@ async def analyze_combined(
         try:
             image_bytes = await file.read()
             if image_bytes:
-                raw = predict_deepfake(image_bytes)
+                raw = await predict_deepfake_async(image_bytes)
                 image_result = DeepfakeResponse(**raw)
         except Exception as exc:
             logger.warning("Image analysis failed in combined endpoint: %s", exc)
@@ -297,6 +525,10 @@ async def analyze_combined(
 
 # ── Dev runner ─────────────────────────────────────────────────────────
 
+# Production: scale across cores with worker processes instead, e.g.
+#   W=4; HF_NUM_THREADS=$(( $(nproc) / W )) HF_PRELOAD=true \
+#     gunicorn main:app --preload -k uvicorn.workers.UvicornWorker -w "$W"
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -305,5 +537,6 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         log_level=settings.log_level,
-        reload=False,  # reload=True breaks deepfake model state (subprocess loses loaded weights)
+        # Opt-in via RELOAD=true: every reload restarts the worker and reloads both models
+        reload=settings.reload,
     )
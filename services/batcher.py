@@ -0,0 +1,108 @@
+"""Async micro-batcher for model inference.
+
+Coalesces concurrent single-item requests into one call of a synchronous
+batch function, which runs off the event loop.  A batch is dispatched once
+``max_batch`` items are queued or ``max_wait_ms`` has passed since the
+first item arrived, whichever comes first.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Any, Callable
+
+logger = logging.getLogger("clarix.batcher")
+
+
+class MicroBatcher:
+    """Queue + background worker that feeds ``fn`` with batches of items.
+
+    ``fn`` receives a list of items and must return one result per item, in
+    order.  If it raises (or returns the wrong number of results), every
+    caller in that batch gets the exception.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[list[Any]], list[Any]],
+        *,
+        max_batch: int,
+        max_wait_ms: float,
+        name: str,
+        executor: Executor | None = None,
+    ) -> None:
+        self._fn = fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self._executor = executor
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None
+
+    async def start(self) -> None:
+        """Start the background worker.  Called from FastAPI lifespan."""
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            "%s batcher started (max_batch=%d, timeout=%.1fms)",
+            self.name, self.max_batch, self.max_wait * 1000,
+        )
+
+    async def stop(self) -> None:
+        """Cancel the background worker."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._queue = self._worker = None
+
+    async def submit(self, item: Any) -> Any:
+        """Queue *item* and wait for its result.  Requires ``start()``."""
+        if self._queue is None:
+            raise RuntimeError(f"{self.name} batcher is not running")
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, fut))
+        return await fut
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            items = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(items) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            batch = [item for item, _ in items]
+            try:
+                results = await loop.run_in_executor(self._executor, self._fn, batch)
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"{self.name} batch function returned {len(results)} results for {len(items)} items"
+                    )
+            except Exception as exc:
+                for _, fut in items:
+                    if not fut.done():
+                        fut.set_exception(exc)
+                continue
+
+            for (_, fut), result in zip(items, results):
+                if not fut.done():
+                    fut.set_result(result)
@@ -0,0 +1,95 @@
+"""In-process TTL + LRU cache for parsed LLM JSON replies.
+
+Identical ``(system_prompt, user_message, temperature)`` triples — page
+reloads, client retries, the same URL submitted twice — are answered from
+memory instead of paying for another round-trip to the provider.
+
+``TTLCache`` and ``content_digest`` are also used by ``main`` to cache whole
+``/predict`` and ``/verify`` responses.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+import orjson
+from blake3 import blake3
+
+from config import settings
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire ``ttl`` seconds after insert.
+
+    ``ttl=None`` means entries never expire (plain LRU).  ``maxsize <= 0`` or
+    ``ttl <= 0`` disables the cache.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and (self.ttl is None or self.ttl > 0)
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires is not None and expires < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def content_digest(text: str) -> bytes:
+    """128-bit BLAKE3 digest of *text*, used in place of large cache keys.
+
+    BLAKE3's SIMD implementation hashes a 50 KB input several times faster
+    than hashlib's BLAKE2b.
+    """
+    return blake3(text.encode("utf-8")).digest(length=16)
+
+
+def make_key(
+    system_prompt: str,
+    user_message: str,
+    temperature: float | None,
+    response_format: dict[str, Any] | None = None,
+) -> tuple:
+    """Build a cache key for one chat-completion call.
+
+    Prompts are module-level constants, so the string itself is a cheap key
+    component (its hash is cached).  The user message can be up to 50 KB and
+    is reduced to a 128-bit digest to bound memory.  The requested
+    *response_format* (JSON mode vs a particular json_schema) changes the
+    reply's shape, so it is part of the key, serialised canonically.
+    """
+    fmt = orjson.dumps(response_format, option=orjson.OPT_SORT_KEYS) if response_format else None
+    return (system_prompt, temperature, content_digest(user_message), fmt)
+
+
+# Shared by every ``chat_completion_json`` caller.  Cached values are the
+# parsed reply dicts and must be treated as read-only.
+response_cache = TTLCache(settings.llm_cache_size, settings.llm_cache_ttl)
@@ -2,37 +2,57 @@
 
 from __future__ import annotations
 
-import json
 import logging
 from typing import Any
 
+import httpx
+import openai
+import orjson
 from openai import AsyncOpenAI, AsyncAzureOpenAI
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from config import settings
+from services.llm_cache import make_key, response_cache
 
 logger = logging.getLogger("clarix.llm")
 
 
+def _build_http_client() -> httpx.AsyncClient:
+    """Connection pool shared by the provider client.
+
+    HTTP/2 multiplexes the pipeline's concurrent LLM calls over one
+    keep-alive TLS connection instead of handshaking per pool slot.
+    Otherwise keeps the SDK's own defaults (connection limits, redirects);
+    the read timeout must cover the longest non-streamed completion.
+    """
+    return openai.DefaultAsyncHttpxClient(
+        http2=True,
+        timeout=httpx.Timeout(settings.llm_timeout, connect=5.0),
+    )
+
+
 def _build_client() -> tuple[AsyncOpenAI, str]:
     """Return (async_client, model_name) based on the configured provider."""
     provider = settings.llm_provider.lower()
+    http_client = _build_http_client()
 
     if provider == "azure":
         client = AsyncAzureOpenAI(
             azure_endpoint=settings.azure_openai_endpoint,
             api_key=settings.azure_openai_api_key,
             api_version="2024-12-01-preview",
+            http_client=http_client,
         )
         model = settings.azure_openai_deployment
     elif provider == "local":
         client = AsyncOpenAI(
             base_url=settings.local_llm_base_url,
             api_key="not-needed",
+            http_client=http_client,
         )
         model = settings.local_llm_model
     else:  # default: openai
-        client = AsyncOpenAI(api_key=settings.openai_api_key)
+        client = AsyncOpenAI(api_key=settings.openai_api_key, http_client=http_client)
         model = settings.openai_model
 
     return client, model
@@ -41,14 +61,40 @@ def _build_client() -> tuple[AsyncOpenAI, str]:
 _client, _model = _build_client()
 
 
+def _get_client() -> AsyncOpenAI:
+    """Return the shared client, rebuilding it if ``aclose()`` closed it.
+
+    Lets the app go through more than one lifespan in a process (test
+    clients, embedding) without every later LLM call failing.
+    """
+    global _client
+    if _client.is_closed():
+        _client, _ = _build_client()
+    return _client
+
+
+async def aclose() -> None:
+    """Close the shared connection pool.  Called from FastAPI lifespan."""
+    await _client.close()
+
+
 class LLMError(Exception):
     """Raised when the LLM call fails after retries."""
 
 
+# Only transient provider/network failures are worth another round-trip;
+# 4xx request errors and bad replies fail the same way every time.
+_RETRYABLE = (
+    openai.APIConnectionError,  # includes APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
 @retry(
     stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=2, max=30),
-    retry=retry_if_exception_type(Exception),
+    wait=wait_exponential(multiplier=0.5, min=0.5, max=8),
+    retry=retry_if_exception_type(_RETRYABLE),
     reraise=True,
 )
 async def chat_completion(
@@ -90,7 +136,7 @@ async def chat_completion(
         kwargs["response_format"] = response_format
 
     try:
-        response = await _client.chat.completions.create(**kwargs)
+        response = await _get_client().chat.completions.create(**kwargs)
         content = response.choices[0].message.content
         if content is None:
             raise LLMError("LLM returned empty content.")
@@ -100,21 +146,73 @@ async def chat_completion(
         raise
 
 
+_JSON_MODE: dict[str, Any] = {"type": "json_object"}
+
+
+def _structured_output_enabled() -> bool:
+    if settings.llm_structured_output is not None:
+        return settings.llm_structured_output
+    return settings.llm_provider.lower() != "local"
+
+
 async def chat_completion_json(
     system_prompt: str,
     user_message: str,
     *,
     temperature: float | None = None,
+    json_schema: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
-    """Like ``chat_completion`` but forces JSON output and parses it."""
-    raw = await chat_completion(
-        system_prompt,
-        user_message,
-        temperature=temperature,
-        response_format={"type": "json_object"},
-    )
-    try:
-        return json.loads(raw)
-    except json.JSONDecodeError as exc:
-        logger.error("Failed to parse LLM JSON: %s\nRaw: %s", exc, raw[:500])
-        raise LLMError(f"LLM returned invalid JSON: {exc}") from exc
+    """Like ``chat_completion`` but forces JSON output and parses it.
+
+    With *json_schema* (an OpenAI ``{"name", "schema", "strict"}`` object)
+    the reply is constrained to that schema via structured outputs when
+    enabled (see ``_structured_output_enabled``); otherwise, or if the
+    provider rejects the schema with a 400, plain JSON mode is used.
+
+    Parsed replies are cached by prompt + content hash (see
+    ``services.llm_cache``); callers must not mutate the returned dict.
+    A reply that isn't valid JSON is re-requested once at ``temperature=0``.
+    """
+    if json_schema is not None and _structured_output_enabled():
+        response_format = {"type": "json_schema", "json_schema": json_schema}
+    else:
+        response_format = _JSON_MODE
+
+    key = make_key(system_prompt, user_message, temperature, response_format)
+    cached = response_cache.get(key)
+    if cached is not None:
+        logger.debug("LLM cache hit")
+        return cached
+
+    for attempt, attempt_temp in enumerate((temperature, 0.0)):
+        try:
+            raw = await chat_completion(
+                system_prompt,
+                user_message,
+                temperature=attempt_temp,
+                response_format=response_format,
+            )
+        except openai.BadRequestError as exc:
+            if response_format is _JSON_MODE:
+                raise
+            logger.warning("Provider rejected json_schema output; falling back to JSON mode: %s", exc)
+            response_format = _JSON_MODE
+            raw = await chat_completion(
+                system_prompt,
+                user_message,
+                temperature=attempt_temp,
+                response_format=response_format,
+            )
+        try:
+            data = orjson.loads(raw)
+            break
+        except orjson.JSONDecodeError as exc:
+            # Only the final failure is an error; the first one is retried
+            log = logger.warning if attempt == 0 else logger.error
+            log("Failed to parse LLM JSON: %s\nRaw: %s", exc, raw[:500])
+            error = exc
+    else:
+        raise LLMError(f"LLM returned invalid JSON: {error}") from error
+
+    response_cache.set(key, data)
+    return data
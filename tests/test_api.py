@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+import threading
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -12,7 +14,11 @@ from fastapi.testclient import TestClient
 import os
 os.environ.pop("INTERNAL_TOKEN", None)
 
+import main
 from main import app
+from schemas.request import VerifyRequest
+from schemas.response import VerifyResponse
+from services.llm_cache import response_cache
 
 
 client = TestClient(app)
@@ -67,13 +73,41 @@ def _patch_llm():
         p.stop()
 
 
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    """Stop cached responses from one test answering the next."""
+    for cache in (main._verify_cache, main._hf_cache, response_cache):
+        cache.clear()
+    yield
+
+
 class TestHealthEndpoint:
     def test_health(self):
         resp = client.get("/health")
         assert resp.status_code == 200
         data = resp.json()
         assert data["status"] == "ok"
-        assert data["version"] == "0.2.0"
+        assert data["version"] == "0.3.0"
+
+
+class TestLifespan:
+    def test_health_answers_while_models_load(self):
+        release, finished = threading.Event(), threading.Event()
+
+        def _slow_load(*args, **kwargs):  # noqa: ARG001
+            release.wait(1)
+            finished.set()
+
+        with patch.object(main, "load_deepfake_model", _slow_load), \
+                patch.object(main, "_load_hf_model", _slow_load), \
+                TestClient(app) as c:
+            try:
+                resp = c.get("/health")
+                assert not finished.is_set()
+                assert resp.status_code == 200
+                assert resp.json()["deepfake_model_loaded"] is False
+            finally:
+                release.set()
 
 
 class TestVerifyEndpoint:
@@ -207,3 +241,63 @@ class TestInternalAuth:
             assert resp.status_code == 401
         finally:
             settings.internal_token = original
+
+
+class TestPredictBatch:
+    def test_int8_batches_run_one_text_per_forward(self, monkeypatch):
+        monkeypatch.setattr(main.settings, "hf_int8", True)
+        forwards = []
+        real = main._predict_fake_news_batch
+
+        def _forward(texts):
+            forwards.append(texts)
+            return [{"label": text} for text in texts]
+
+        # The row-by-row path re-enters through the module global
+        with patch.object(main, "_predict_fake_news_batch", _forward):
+            results = real(["a", "b", "c"])
+        assert forwards == [["a"], ["b"], ["c"]]
+        assert [r["label"] for r in results] == ["a", "b", "c"]
+
+
+class TestVerifyCache:
+    @pytest.fixture
+    def pipeline(self):
+        """Replace ``run_pipeline`` with a slow fake that counts its calls."""
+        calls = []
+
+        async def _fake(content, **kw):
+            calls.append((content, kw["content_type"]))
+            await asyncio.sleep(0.01)
+            return VerifyResponse.model_construct(summary=content, request_id=kw["request_id"])
+
+        with patch.object(main, "run_pipeline", _fake):
+            yield calls
+
+    async def test_cache_hit_skips_pipeline(self, pipeline):
+        first = await main._verify_cached(VerifyRequest(content="Same text."))
+        second = await main._verify_cached(VerifyRequest(content="Same text."))
+        assert len(pipeline) == 1
+        assert second.summary == first.summary
+
+    async def test_concurrent_identical_requests_share_one_run(self, pipeline):
+        results = await asyncio.gather(
+            *(main._verify_cached(VerifyRequest(content="Same text.")) for _ in range(5))
+        )
+        assert len(pipeline) == 1
+        assert all(r.summary == "Same text." for r in results)
+        assert main._verify_inflight == {}
+
+    async def test_request_id_patched_per_caller(self, pipeline):
+        results = await asyncio.gather(
+            *(main._verify_cached(VerifyRequest(content="Same text.", request_id=f"r{i}")) for i in range(3))
+        )
+        cached = await main._verify_cached(VerifyRequest(content="Same text.", request_id="later"))
+        assert [r.request_id for r in results] == ["r0", "r1", "r2"]
+        assert cached.request_id == "later"
+        assert len(pipeline) == 1
+
+    async def test_content_type_is_part_of_key(self, pipeline):
+        await main._verify_cached(VerifyRequest(content="Same text.", content_type="news"))
+        await main._verify_cached(VerifyRequest(content="Same text.", content_type="satire"))
+        assert pipeline == [("Same text.", "news"), ("Same text.", "satire")]
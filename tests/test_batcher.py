@@ -0,0 +1,98 @@
+"""Tests for the async micro-batcher."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from services.batcher import MicroBatcher
+
+
+def _recording(fn):
+    """Wrap a batch function so every batch it receives is recorded."""
+    batches = []
+
+    def _fn(items):
+        batches.append(list(items))
+        return fn(items)
+
+    return _fn, batches
+
+
+@pytest.fixture
+async def make_batcher():
+    started = []
+
+    async def _make(fn, *, max_batch=4, max_wait_ms=20.0):
+        batcher = MicroBatcher(fn, max_batch=max_batch, max_wait_ms=max_wait_ms, name="Test")
+        await batcher.start()
+        started.append(batcher)
+        return batcher
+
+    yield _make
+    for batcher in started:
+        await batcher.stop()
+
+
+class TestMicroBatcher:
+    async def test_results_returned_in_order(self, make_batcher):
+        fn, _ = _recording(lambda xs: [x * 10 for x in xs])
+        batcher = await make_batcher(fn)
+        assert await asyncio.gather(*(batcher.submit(i) for i in range(3))) == [0, 10, 20]
+
+    async def test_full_batch_dispatched_at_max_batch(self, make_batcher):
+        fn, batches = _recording(lambda xs: xs)
+        # A timeout long enough that only max_batch can trigger dispatch
+        batcher = await make_batcher(fn, max_batch=3, max_wait_ms=10_000)
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(6))), timeout=2,
+        )
+        assert results == list(range(6))
+        assert batches == [[0, 1, 2], [3, 4, 5]]
+
+    async def test_partial_batch_dispatched_after_timeout(self, make_batcher):
+        fn, batches = _recording(lambda xs: xs)
+        batcher = await make_batcher(fn, max_batch=8, max_wait_ms=20)
+        assert await asyncio.gather(batcher.submit("a"), batcher.submit("b")) == ["a", "b"]
+        assert batches == [["a", "b"]]
+
+    async def test_exception_reaches_every_caller(self, make_batcher):
+        def _boom(xs):
+            raise ValueError("bad batch")
+
+        batcher = await make_batcher(_boom)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+
+    async def test_short_result_list_fails_every_caller(self, make_batcher):
+        batcher = await make_batcher(lambda xs: [])
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(2)), return_exceptions=True), timeout=2,
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def test_worker_survives_failed_batch(self, make_batcher):
+        calls = iter([ValueError("first"), None])
+
+        def _fn(xs):
+            exc = next(calls)
+            if exc:
+                raise exc
+            return xs
+
+        batcher = await make_batcher(_fn)
+        with pytest.raises(ValueError):
+            await batcher.submit(1)
+        assert await batcher.submit(2) == 2
+
+    async def test_stop(self):
+        batcher = MicroBatcher(lambda xs: xs, max_batch=2, max_wait_ms=5, name="Test")
+        assert not batcher.running
+        await batcher.start()
+        assert batcher.running
+        await batcher.stop()
+        assert not batcher.running
+        with pytest.raises(RuntimeError):
+            await batcher.submit(1)
+        await batcher.stop()  # idempotent
@@ -1,19 +1,39 @@
-"""Unit tests for the deterministic engine components (scorer, verdict, heuristics)."""
+"""Unit tests for the engine components (scorer, verdict, heuristics, claim verifier)."""
 
 from __future__ import annotations
 
+import asyncio
+from contextlib import ExitStack
+from functools import lru_cache
+from itertools import repeat
+from unittest.mock import AsyncMock, patch
+
 import pytest
+from pydantic import ValidationError
 
 from engine.scorer import compute_score
 from engine.verdict import determine_verdict
 from engine.heuristics import assess_source_credibility, assess_evidence_quality
+from engine.claim_verifier import verify_claims
+from engine.pipeline import run_pipeline
+from engine.probability import softmax2
+from config import settings
 from schemas.response import ClaimAnalysis, ClaimVerdict, BiasSignal, OverallVerdict
 
+# Pure-Python, sub-millisecond tests: under ``--dist=loadgroup`` keep them on
+# one xdist worker rather than paying IPC per test.
+pytestmark = pytest.mark.xdist_group("engine_pure")
+
 
 # ── Helpers ────────────────────────────────────────────────────────────
 
+# Fixtures only feed attribute reads in the scorer/heuristics, so skip
+# Pydantic validation when building them, and share one instance per
+# distinct argument set.  Nothing mutates them.
+
+@lru_cache(maxsize=None)
 def _claim(verdict: ClaimVerdict, confidence: float = 0.8) -> ClaimAnalysis:
-    return ClaimAnalysis(
+    return ClaimAnalysis.model_construct(
         claim="Test claim",
         verdict=verdict,
         confidence=confidence,
@@ -22,92 +42,94 @@ def _claim(verdict: ClaimVerdict, confidence: float = 0.8) -> ClaimAnalysis:
     )
 
 
+@lru_cache(maxsize=None)
 def _bias(signal: str, detail: str = "") -> BiasSignal:
-    return BiasSignal(signal=signal, detail=detail)
+    return BiasSignal.model_construct(signal=signal, detail=detail)
 
 
-# ── Scorer tests ───────────────────────────────────────────────────────
-
-class TestScorer:
-    def test_base_score_no_claims_no_signals(self):
-        score = compute_score([], [])
-        assert score == 50
+CLAIM_SUPPORTED_08 = _claim(ClaimVerdict.SUPPORTED, 0.8)
+CLAIM_CONTRADICTED_08 = _claim(ClaimVerdict.CONTRADICTED, 0.8)
+CLAIM_UNVERIFIED_08 = _claim(ClaimVerdict.UNVERIFIED, 0.8)
 
-    def test_supported_claims_increase_score(self):
-        claims = [_claim(ClaimVerdict.SUPPORTED) for _ in range(3)]
-        score = compute_score(claims, [])
-        assert score == 50 + 3 * 12  # 86
+_VERDICT_VALUE = {v: v.value for v in ClaimVerdict}
 
-    def test_contradicted_claims_decrease_score(self):
-        claims = [_claim(ClaimVerdict.CONTRADICTED) for _ in range(2)]
-        score = compute_score(claims, [])
-        assert score == 50 - 2 * 18  # 14
 
-    def test_unverified_claims_decrease_score(self):
-        claims = [_claim(ClaimVerdict.UNVERIFIED) for _ in range(4)]
-        score = compute_score(claims, [])
-        assert score == 50 - 4 * 5  # 30
+def _claims_as_dicts(claims: list[ClaimAnalysis]) -> list[dict]:
+    """Shape *claims* the way the pipeline passes them to ``assess_evidence_quality``."""
+    return [{"confidence": c.confidence, "verdict": _VERDICT_VALUE[c.verdict]} for c in claims]
 
-    def test_bias_signals_apply_penalties(self):
-        signals = [_bias("Sensationalism"), _bias("Missing context")]
-        score = compute_score([], signals)
-        assert score == 50 - 10 - 8  # 32
 
-    def test_score_clamped_to_0(self):
-        claims = [_claim(ClaimVerdict.CONTRADICTED) for _ in range(10)]
-        score = compute_score(claims, [])
-        assert score == 0
+@pytest.fixture(scope="module", autouse=True)
+def _warm_engine():
+    """Run each engine entry point once so first-call costs land outside the timed tests."""
+    compute_score([], [])
+    determine_verdict(50)
+    assess_source_credibility(None, "")
+    assess_evidence_quality([])
 
-    def test_score_clamped_to_100(self):
-        claims = [_claim(ClaimVerdict.SUPPORTED) for _ in range(10)]
-        score = compute_score(claims, [], source_credibility=20, evidence_quality=15)
-        assert score == 100
 
-    def test_source_credibility_modifier(self):
-        score = compute_score([], [], source_credibility=20)
-        assert score == 70
+# ── Scorer tests ───────────────────────────────────────────────────────
 
-    def test_evidence_quality_modifier(self):
-        score = compute_score([], [], evidence_quality=-12)
-        assert score == 38
+class TestScorer:
+    @pytest.mark.parametrize(
+        "claims,signals,kwargs,expected",
+        [
+            pytest.param([], [], {}, 50, id="base_score_no_claims_no_signals"),
+            pytest.param([CLAIM_SUPPORTED_08] * 3, [], {}, 50 + 3 * 12, id="supported_claims_increase_score"),  # 86
+            pytest.param([CLAIM_CONTRADICTED_08] * 2, [], {}, 50 - 2 * 18, id="contradicted_claims_decrease_score"),  # 14
+            pytest.param([CLAIM_UNVERIFIED_08] * 4, [], {}, 50 - 4 * 5, id="unverified_claims_decrease_score"),  # 30
+            pytest.param(
+                [], [_bias("Sensationalism"), _bias("Missing context")], {}, 50 - 10 - 8,
+                id="bias_signals_apply_penalties",
+            ),  # 32
+            pytest.param([CLAIM_CONTRADICTED_08] * 10, [], {}, 0, id="score_clamped_to_0"),
+            pytest.param(
+                [CLAIM_SUPPORTED_08] * 10, [], {"source_credibility": 20, "evidence_quality": 15}, 100,
+                id="score_clamped_to_100",
+            ),
+            pytest.param([], [], {"source_credibility": 20}, 70, id="source_credibility_modifier"),
+            pytest.param([], [], {"evidence_quality": -12}, 38, id="evidence_quality_modifier"),
+        ],
+    )
+    def test_compute_score(self, claims, signals, kwargs, expected):
+        assert compute_score(claims, signals, **kwargs) == expected
 
 
 # ── Verdict tests ──────────────────────────────────────────────────────
 
 class TestVerdict:
-    def test_verified(self):
-        assert determine_verdict(85) == OverallVerdict.VERIFIED
-        assert determine_verdict(100) == OverallVerdict.VERIFIED
-
-    def test_questionable(self):
-        assert determine_verdict(65) == OverallVerdict.QUESTIONABLE
-        assert determine_verdict(84) == OverallVerdict.QUESTIONABLE
+    # Both edges of each verdict band
+    _VERDICT_CASES: tuple[tuple[int, OverallVerdict], ...] = (
+        tuple((s, OverallVerdict.VERIFIED) for s in (85, 100))
+        + tuple((s, OverallVerdict.QUESTIONABLE) for s in (65, 84))
+        + tuple((s, OverallVerdict.MISLEADING) for s in (0, 64))
+    )
 
-    def test_misleading(self):
-        assert determine_verdict(0) == OverallVerdict.MISLEADING
-        assert determine_verdict(64) == OverallVerdict.MISLEADING
+    @pytest.mark.parametrize("score,expected", _VERDICT_CASES)
+    def test_verdict(self, score, expected):
+        assert determine_verdict(score) is expected
 
 
 # ── Heuristics tests ──────────────────────────────────────────────────
 
 class TestSourceCredibility:
-    def test_institutional_source(self):
-        assert assess_source_credibility("https://who.int/report", "") == 20
-
-    def test_journalism_source(self):
-        assert assess_source_credibility("https://reuters.com/article/123", "") == 12
-
-    def test_misinfo_source(self):
-        assert assess_source_credibility("https://infowars.com/post", "") == -25
-
-    def test_unknown_url(self):
-        assert assess_source_credibility("https://unknownblog.example.com", "") == -10
-
-    def test_no_url(self):
-        assert assess_source_credibility(None, "Some random content") == -5
-
-    def test_institutional_in_content(self):
-        assert assess_source_credibility(None, "According to data from cdc.gov the rate is...") == 20
+    @pytest.mark.parametrize(
+        "url,content,expected",
+        [
+            pytest.param("https://who.int/report", "", 20, id="institutional_source"),
+            pytest.param("https://reuters.com/article/123", "", 12, id="journalism_source"),
+            pytest.param("https://infowars.com/post", "", -25, id="misinfo_source"),
+            pytest.param("https://unknownblog.example.com", "", -10, id="unknown_url"),
+            pytest.param(None, "Some random content", -5, id="no_url"),
+            pytest.param(None, "According to data from cdc.gov the rate is...", 20, id="institutional_in_content"),
+            pytest.param(
+                None, "As reported by reuters.com and who.int (via infowars)...", -25,
+                id="misinfo_outranks_reputable_mentions",
+            ),
+        ],
+    )
+    def test_source_credibility(self, url, content, expected):
+        assert assess_source_credibility(url, content) == expected
 
 
 class TestEvidenceQuality:
@@ -115,15 +137,15 @@ class TestEvidenceQuality:
         assert assess_evidence_quality([]) == -12
 
     def test_all_unverified(self):
-        claims = [{"confidence": 0.5, "verdict": "UNVERIFIED"} for _ in range(3)]
+        claims = list(repeat({"confidence": 0.5, "verdict": "UNVERIFIED"}, 3))
         assert assess_evidence_quality(claims) == -12
 
     def test_high_confidence(self):
-        claims = [{"confidence": 0.9, "verdict": "SUPPORTED"} for _ in range(3)]
+        claims = list(repeat({"confidence": 0.9, "verdict": "SUPPORTED"}, 3))
         assert assess_evidence_quality(claims) == 15
 
     def test_low_confidence(self):
-        claims = [{"confidence": 0.3, "verdict": "SUPPORTED"} for _ in range(2)]
+        claims = list(repeat({"confidence": 0.3, "verdict": "SUPPORTED"}, 2))
         assert assess_evidence_quality(claims) == -8
 
 
@@ -133,12 +155,10 @@ class TestEndToEndScoring:
     """Full scoring path without LLM — exercises scorer + heuristics + verdict."""
 
     def test_reliable_article(self):
-        claims = [_claim(ClaimVerdict.SUPPORTED, 0.9) for _ in range(3)]
+        claims = [_claim(ClaimVerdict.SUPPORTED, 0.9)] * 3
         bias = []
         src_cred = assess_source_credibility("https://bbc.com/news/article", "")
-        ev_qual = assess_evidence_quality(
-            [{"confidence": c.confidence, "verdict": c.verdict.value} for c in claims]
-        )
+        ev_qual = assess_evidence_quality(_claims_as_dicts(claims))
         score = compute_score(claims, bias, source_credibility=src_cred, evidence_quality=ev_qual)
         verdict = determine_verdict(score)
         assert score >= 85
@@ -148,10 +168,114 @@ class TestEndToEndScoring:
         claims = [_claim(ClaimVerdict.CONTRADICTED, 0.3), _claim(ClaimVerdict.UNVERIFIED, 0.2)]
         bias = [_bias("Sensationalism"), _bias("Clickbait"), _bias("Missing context")]
         src_cred = assess_source_credibility(None, "some facebook post says...")
-        ev_qual = assess_evidence_quality(
-            [{"confidence": c.confidence, "verdict": c.verdict.value} for c in claims]
-        )
+        ev_qual = assess_evidence_quality(_claims_as_dicts(claims))
         score = compute_score(claims, bias, source_credibility=src_cred, evidence_quality=ev_qual)
         verdict = determine_verdict(score)
         assert score < 65
         assert verdict == OverallVerdict.MISLEADING
+
+
+# ── Two-class softmax ─────────────────────────────────────────────────
+
+class TestSoftmax2:
+    def test_equal_logits(self):
+        assert softmax2(1.5, 1.5) == (0.5, 0.5)
+
+    def test_symmetric(self):
+        p0, p1 = softmax2(2.0, -1.0)
+        q0, q1 = softmax2(-1.0, 2.0)
+        assert p0 > 0.5 and p0 + p1 == pytest.approx(1.0)
+        assert (p0, p1) == pytest.approx((q1, q0))
+
+    def test_extreme_logits_do_not_overflow(self):
+        assert softmax2(1000.0, -1000.0) == pytest.approx((1.0, 0.0))
+        assert softmax2(-1000.0, 1000.0) == pytest.approx((0.0, 1.0))
+
+
+# ── Claim verifier (mocked LLM) ───────────────────────────────────────
+
+class TestClaimVerifier:
+    @pytest.fixture
+    def llm(self):
+        """Answer each verification call for the claims it lists.
+
+        Later claims answer sooner, so completion order is the reverse of
+        input order.
+        """
+        async def _reply(prompt, msg, **kw):  # noqa: ARG001
+            claims = [line[2:] for line in msg.splitlines() if line.startswith("- ")]
+            await asyncio.sleep(0.01 / int(claims[0].split()[-1]))
+            return {
+                "results": [
+                    {"claim": c, "verdict": "SUPPORTED", "confidence": 0.9, "reason": "r", "credible_sources": []}
+                    for c in claims
+                ]
+            }
+
+        with patch("engine.claim_verifier.chat_completion_json", new_callable=AsyncMock, side_effect=_reply) as mock:
+            yield mock
+
+    async def test_small_set_uses_one_batched_call(self, llm):
+        claims = [f"Claim {i}" for i in range(1, settings.verification_batch_size + 1)]
+        results = await verify_claims(claims)
+        assert llm.await_count == 1
+        assert [r.claim for r in results] == claims
+
+    async def test_large_set_fans_out_one_call_per_claim_in_order(self, llm):
+        claims = [f"Claim {i}" for i in range(1, settings.verification_batch_size + 4)]
+        results = await verify_claims(claims)
+        assert llm.await_count == len(claims)
+        sent = sorted(call.args[1] for call in llm.await_args_list)
+        assert sent == sorted(f"Claims to verify:\n- {c}" for c in claims)
+        assert [r.claim for r in results] == claims
+
+    @pytest.fixture
+    def peak_in_flight(self, monkeypatch):
+        """Cap verification at 2 calls and record the most ever in flight."""
+        monkeypatch.setattr(settings, "verification_concurrency", 2)
+        in_flight = 0
+        peak = [0]
+
+        async def _reply(prompt, msg, **kw):  # noqa: ARG001
+            nonlocal in_flight
+            in_flight += 1
+            peak[0] = max(peak[0], in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"results": []}
+
+        with patch("engine.claim_verifier.chat_completion_json", new_callable=AsyncMock, side_effect=_reply):
+            yield peak
+
+    async def test_fan_out_respects_concurrency_limit(self, peak_in_flight):
+        await verify_claims([f"Claim {i}" for i in range(1, 7)])
+        assert peak_in_flight[0] == 2
+
+    async def test_concurrency_limit_is_shared_across_requests(self, peak_in_flight):
+        claims = [f"Claim {i}" for i in range(1, 5)]
+        await asyncio.gather(verify_claims(claims), verify_claims(claims))
+        assert peak_in_flight[0] == 2
+
+    async def test_verification_requests_structured_output(self, llm):
+        await verify_claims(["Claim 1"])
+        schema = llm.await_args.kwargs["json_schema"]
+        assert schema["strict"] is True
+        assert schema["schema"]["required"] == ["results"]
+
+
+# ── Pipeline (mocked steps) ───────────────────────────────────────────
+
+class TestPipeline:
+    async def test_malformed_summary_fails_validation(self):
+        steps = {
+            "engine.summarizer.chat_completion_json": {"summary": {"text": "x"}},
+            "engine.pipeline.analyze_bias": [],
+            "engine.pipeline.extract_claims": [],
+            "engine.pipeline.verify_claims": [],
+            "engine.pipeline.generate_guidance": [],
+        }
+        with ExitStack() as stack:
+            for target, reply in steps.items():
+                stack.enter_context(patch(target, new_callable=AsyncMock, return_value=reply))
+            with pytest.raises(ValidationError):
+                await run_pipeline("Some article text.")
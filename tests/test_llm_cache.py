@@ -0,0 +1,89 @@
+"""Tests for the TTL + LRU response cache."""
+
+from __future__ import annotations
+
+import pytest
+
+from services import llm_cache
+from services.llm_cache import TTLCache, make_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable ``time.monotonic`` for expiry tests."""
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+class TestTTLCache:
+    def test_get_returns_stored_value(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("missing") is None
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now the oldest
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_entries_expire_after_ttl(self, clock):
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set("a", 1)
+        clock[0] += 9.9
+        assert cache.get("a") == 1
+        clock[0] += 0.2
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_ttl_none_never_expires(self, clock):
+        cache = TTLCache(maxsize=2, ttl=None)
+        cache.set("a", 1)
+        clock[0] += 1e9
+        assert cache.get("a") == 1
+
+    @pytest.mark.parametrize("maxsize,ttl", [(0, 60), (2, 0)])
+    def test_zero_size_or_ttl_disables(self, maxsize, ttl):
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        cache.set("a", 1)
+        assert not cache.enabled
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_clear(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.clear()
+        assert cache.get("a") is None
+
+
+class TestMakeKey:
+    def test_same_inputs_same_key(self):
+        assert make_key("p", "u" * 50_000, 0.2) == make_key("p", "u" * 50_000, 0.2)
+
+    @pytest.mark.parametrize(
+        "other",
+        [
+            ("q", "u", 0.2, None),
+            ("p", "v", 0.2, None),
+            ("p", "u", 0.0, None),
+            ("p", "u", 0.2, {"type": "json_object"}),
+        ],
+    )
+    def test_each_component_changes_key(self, other):
+        assert make_key(*other) != make_key("p", "u", 0.2, None)
+
+    def test_schema_is_part_of_key(self):
+        def fmt(name):
+            return {"type": "json_schema", "json_schema": {"name": name, "schema": {}}}
+
+        assert make_key("p", "u", None, fmt("a")) != make_key("p", "u", None, fmt("b"))
+        # key order inside the format doesn't matter
+        assert make_key("p", "u", None, {"a": 1, "b": 2}) == make_key("p", "u", None, {"b": 2, "a": 1})
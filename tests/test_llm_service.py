@@ -0,0 +1,123 @@
+"""Tests for the LLM wrapper (provider client mocked)."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import openai
+import pytest
+from tenacity import wait_none
+
+from config import settings
+from services import llm_service
+from services.llm_cache import response_cache
+
+_SCHEMA = {"name": "test", "strict": True, "schema": {"type": "object"}}
+
+
+def _status_error(cls, status: int):
+    request = httpx.Request("POST", "https://llm.test/v1/chat/completions")
+    return cls("rejected", response=httpx.Response(status, request=request), body=None)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    response_cache.clear()
+    yield
+
+
+class TestStructuredOutput:
+    async def test_json_schema_sent_when_enabled(self, monkeypatch):
+        monkeypatch.setattr(settings, "llm_structured_output", True)
+        with patch.object(llm_service, "chat_completion", new_callable=AsyncMock, return_value="{}") as mock:
+            await llm_service.chat_completion_json("p", "u", json_schema=_SCHEMA)
+        assert mock.await_args.kwargs["response_format"] == {"type": "json_schema", "json_schema": _SCHEMA}
+
+    async def test_local_provider_defaults_to_json_mode(self, monkeypatch):
+        monkeypatch.setattr(settings, "llm_structured_output", None)
+        monkeypatch.setattr(settings, "llm_provider", "local")
+        with patch.object(llm_service, "chat_completion", new_callable=AsyncMock, return_value="{}") as mock:
+            await llm_service.chat_completion_json("p", "u", json_schema=_SCHEMA)
+        assert mock.await_args.kwargs["response_format"] == {"type": "json_object"}
+
+    async def test_rejected_schema_falls_back_to_json_mode(self, monkeypatch):
+        monkeypatch.setattr(settings, "llm_structured_output", True)
+        replies = [_status_error(openai.BadRequestError, 400), '{"ok": true}']
+        with patch.object(llm_service, "chat_completion", new_callable=AsyncMock, side_effect=replies) as mock:
+            assert await llm_service.chat_completion_json("p", "u", json_schema=_SCHEMA) == {"ok": True}
+        formats = [call.kwargs["response_format"]["type"] for call in mock.await_args_list]
+        assert formats == ["json_schema", "json_object"]
+
+    async def test_bad_request_in_json_mode_is_raised(self):
+        error = _status_error(openai.BadRequestError, 400)
+        with patch.object(llm_service, "chat_completion", new_callable=AsyncMock, side_effect=error) as mock:
+            with pytest.raises(openai.BadRequestError):
+                await llm_service.chat_completion_json("p", "u")
+        assert mock.await_count == 1
+
+
+class TestJsonRetry:
+    async def test_invalid_json_is_re_requested_at_temperature_0(self, caplog):
+        with patch.object(llm_service, "chat_completion", new_callable=AsyncMock, side_effect=["not json", '{"a": 1}']) as mock:
+            assert await llm_service.chat_completion_json("p", "u", temperature=0.7) == {"a": 1}
+        assert [call.kwargs["temperature"] for call in mock.await_args_list] == [0.7, 0.0]
+        assert [r.levelname for r in caplog.records if "Failed to parse" in r.message] == ["WARNING"]
+
+    async def test_invalid_json_twice_raises_llm_error(self, caplog):
+        with patch.object(llm_service, "chat_completion", new_callable=AsyncMock, side_effect=["nope", "still nope"]) as mock:
+            with pytest.raises(llm_service.LLMError):
+                await llm_service.chat_completion_json("p", "u")
+        assert mock.await_count == 2
+        assert [r.levelname for r in caplog.records if "Failed to parse" in r.message] == ["WARNING", "ERROR"]
+
+
+def _completion(content: str) -> MagicMock:
+    response = MagicMock()
+    response.choices[0].message.content = content
+    return response
+
+
+class TestRetryPolicy:
+    @pytest.fixture
+    def create(self, monkeypatch):
+        """Patch the provider call and skip tenacity's backoff sleeps."""
+        monkeypatch.setattr(llm_service.chat_completion.retry, "wait", wait_none())
+        client = MagicMock()
+        client.is_closed.return_value = False
+        client.chat.completions.create = AsyncMock()
+        monkeypatch.setattr(llm_service, "_client", client)
+        return client.chat.completions.create
+
+    async def test_transient_errors_are_retried(self, create):
+        request = httpx.Request("POST", "https://llm.test/v1/chat/completions")
+        create.side_effect = [
+            openai.APIConnectionError(request=request),
+            _status_error(openai.RateLimitError, 429),
+            _completion("ok"),
+        ]
+        assert await llm_service.chat_completion("p", "u") == "ok"
+        assert create.await_count == 3
+
+    async def test_client_errors_are_not_retried(self, create):
+        create.side_effect = _status_error(openai.BadRequestError, 400)
+        with pytest.raises(openai.BadRequestError):
+            await llm_service.chat_completion("p", "u")
+        assert create.await_count == 1
+
+    async def test_empty_reply_is_not_retried(self, create):
+        create.return_value = _completion(None)
+        with pytest.raises(llm_service.LLMError):
+            await llm_service.chat_completion("p", "u")
+        assert create.await_count == 1
+
+
+class TestClientLifecycle:
+    async def test_client_is_rebuilt_after_aclose(self, monkeypatch):
+        client, _ = llm_service._build_client()
+        monkeypatch.setattr(llm_service, "_client", client)
+        await llm_service.aclose()
+        rebuilt = llm_service._get_client()
+        assert rebuilt is not client
+        assert not rebuilt.is_closed()
+        await rebuilt.close()